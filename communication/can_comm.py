@@ -1,13 +1,36 @@
 # -*- coding: utf-8 -*-
 """CAN communication module."""
 
+import queue
+import socket
+import threading
+import time
+
 import can
 
 
 class CANCommunication:
-    """Handles CAN communication using python-can."""
+    """
+    Handles CAN communication using python-can.
+    Outgoing frames are queued and written by a background thread in small
+    batches, so bursts of sends do not overrun the socketcan TX queue.
+    If frames are still dropped (ENOBUFS), enlarge the kernel queue, e.g.
+    sudo ip link set can0 txqueuelen 1000
+    """
+
+    # Maximum number of frames written back to back before pausing
+    TX_BATCH_SIZE = 4
+    # Longest disconnect() waits for the TX thread to finish its batch
+    TX_STOP_TIMEOUT = 1.0
+    # Kernel receive buffer requested for the bus socket, in bytes
+    RX_SOCKET_BUFFER = 2 << 20
+    # Attributes under which TCP based interfaces (socketcand) keep their
+    # socket; python-can does not expose it publicly
+    TCP_SOCKET_ATTRS = ('_SocketCanDaemonBus__socket', '_socket', 's')
 
-    def __init__(self, channel, bitrate=500000, interface='socketcan'):
+    def __init__(self, channel, bitrate=500000, interface='socketcan',
+                 delay_between_batches_ms=10, tx_queue_size=256,
+                 on_tx_error=None):
         """
         Initializes the CAN communication object.
 
@@ -15,11 +38,23 @@ class CANCommunication:
             channel (str): CAN interface channel (e.g., 'can0').
             bitrate (int): The bus speed in bits/sec.
             interface (str): The backend interface to use (e.g., 'socketcan').
+            delay_between_batches_ms (int): Pause after each TX batch.
+            tx_queue_size (int): Maximum number of frames waiting to be sent.
+            on_tx_error (callable): Called from the TX thread as
+                                    on_tx_error(payload, error) when a frame
+                                    fails. Without it, the error is raised
+                                    by the next send_data().
         """
         self.channel = channel
         self.bitrate = bitrate
         self.interface = interface
+        self.delay_between_batches_ms = delay_between_batches_ms
+        self.on_tx_error = on_tx_error
         self.bus = None
+        self._tx_queue = queue.Queue(maxsize=tx_queue_size)
+        self._tx_thread = None
+        self._tx_msg = None
+        self._tx_error = None
 
     def connect(self):
         """Initializes the CAN bus."""
@@ -35,9 +70,69 @@ class CANCommunication:
             )
         except Exception as e:
             raise ConnectionError(f"Failed to initialize CAN bus on {self.channel}: {e}")
+        self._enlarge_rx_buffer()
+        self._tune_tcp_socket()
+        self._tx_error = None
+        # Reused for every frame by the TX thread, which is its only user
+        self._tx_msg = can.Message(
+            arbitration_id=0x123, data=bytes(8), is_extended_id=False
+        )
+        self._tx_thread = threading.Thread(target=self._tx_loop, daemon=True)
+        self._tx_thread.start()
+
+    def _enlarge_rx_buffer(self):
+        """
+        Enlarges the kernel receive buffer of the socketcan socket so bursts
+        are queued rather than dropped while the worker is busy. Interfaces
+        without a raw socket are left untouched.
+        """
+        sock = getattr(self.bus, 'socket', None)
+        if not isinstance(sock, socket.socket):
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                            self.RX_SOCKET_BUFFER)
+        except OSError:
+            pass  # The kernel default still works, just with less headroom
+
+    def _tune_tcp_socket(self):
+        """
+        Disables Nagle's algorithm and delayed ACKs when frames are tunnelled
+        over TCP (e.g. interface='socketcand'). Both add up to tens of ms to
+        every small request/response, so keep both options set.
+        """
+        for attr in self.TCP_SOCKET_ATTRS:
+            sock = getattr(self.bus, attr, None)
+            if isinstance(sock, socket.socket):
+                break
+        else:
+            return
+        if sock.family not in (socket.AF_INET, socket.AF_INET6):
+            return
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Linux only
+            if hasattr(socket, 'TCP_QUICKACK'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+        except OSError:
+            pass
 
     def disconnect(self):
         """Shuts down the CAN bus."""
+        if self._tx_thread:
+            # Drop frames that have not been picked up yet; on a bus without
+            # an ACKing node flushing them could block the caller for seconds
+            while True:
+                try:
+                    self._tx_queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self._tx_queue.put(None, timeout=self.TX_STOP_TIMEOUT)
+            except queue.Full:
+                pass  # Refilled by a concurrent sender; stop waiting for it
+            self._tx_thread.join(self.TX_STOP_TIMEOUT)
+            self._tx_thread = None
         if self.bus:
             self.bus.shutdown()
             self.bus = None
@@ -46,40 +141,122 @@ class CANCommunication:
         """Checks if the CAN bus is initialized."""
         return self.bus is not None
 
+    def fileno(self):
+        """
+        Returns the bus socket file descriptor for readiness polling.
+
+        Returns:
+            int: The descriptor, or None if the interface cannot be polled.
+        """
+        if not self.is_connected():
+            return None
+        try:
+            return self.bus.fileno()
+        except NotImplementedError:
+            return None
+
     def send_data(self, data, arbitration_id=0x123):
         """
-        Sends a message over the CAN bus.
+        Queues a message for sending over the CAN bus.
 
         Args:
-            data (str): String data to be encoded and sent.
+            data (str or bytes): Data to send. Strings are encoded as UTF-8.
             arbitration_id (int): The CAN message identifier.
+
+        Raises:
+            ConnectionError: If not connected.
+            IOError: If the TX queue is full, or if an earlier frame failed
+                     and no on_tx_error callback is set. In the latter case
+                     this message has still been queued.
         """
         if not self.is_connected():
             raise ConnectionError("CAN bus not connected.")
+        if isinstance(data, (bytes, bytearray)):
+            payload = data
+        else:
+            payload = data.encode('utf-8')
         try:
-            message = can.Message(
-                arbitration_id=arbitration_id,
-                data=data.encode('utf-8'),
-                is_extended_id=False
-            )
-            self.bus.send(message)
-        except can.CanError as e:
-            raise IOError(f"Error sending CAN message: {e}")
+            self._tx_queue.put_nowait((arbitration_id, payload))
+        except queue.Full:
+            raise IOError("CAN TX queue is full.")
+        if self._tx_error:
+            error, self._tx_error = self._tx_error, None
+            raise IOError(f"Error sending an earlier CAN message: {error}")
+
+    def _tx_loop(self):
+        """Writes queued frames in batches until the None sentinel arrives."""
+        message = self._tx_msg
+        while True:
+            frames = [self._tx_queue.get()]
+            for _ in range(self.TX_BATCH_SIZE - 1):
+                try:
+                    frames.append(self._tx_queue.get_nowait())
+                except queue.Empty:
+                    break
+            for frame in frames:
+                if frame is None:
+                    return
+                # bus.send() serializes the frame before returning, so the
+                # same Message object can carry every frame
+                message.arbitration_id, message.data = frame
+                message.dlc = len(message.data)
+                try:
+                    self.bus.send(message, timeout=0.1)
+                except Exception as e:
+                    # The thread keeps running so the queue is still drained
+                    if self.on_tx_error:
+                        self.on_tx_error(frame[1], e)
+                    else:
+                        self._tx_error = e
+            time.sleep(self.delay_between_batches_ms / 1000)
 
     def receive_data(self, timeout=1.0):
         """
-        Receives a message from the CAN bus.
+        Receives all pending messages from the CAN bus.
 
         Args:
-            timeout (float): Time to wait for a message in seconds.
+            timeout (float): Time to wait for the first message in seconds.
 
         Returns:
-            str: The decoded message data or None if timeout occurs.
+            str: The decoded message data, one message per line, or None if
+                 timeout occurs.
+        """
+        messages = self.receive_data_batch(timeout)
+        if messages:
+            return b'\n'.join(messages).decode('utf-8', errors='ignore')
+        return None
+
+    def receive_data_batch(self, timeout=1.0):
+        """
+        Waits for one message, then drains every message already queued in
+        the kernel without blocking.
+
+        Args:
+            timeout (float): Time to wait for the first message in seconds.
+
+        Returns:
+            list[bytearray]: The raw data of non-empty messages, empty if
+                             timeout occurs. Decoding is left to the
+                             consumer so frames that are never displayed
+                             are never decoded.
         """
         if not self.is_connected():
             raise ConnectionError("CAN bus not connected.")
-            
+
+        messages = []
         message = self.bus.recv(timeout)
-        if message:
-            return message.data.decode('utf-8', errors='ignore')
-        return None
+        while message:
+            # Zero-length frames carry nothing to display
+            if message.data:
+                messages.append(message.data)
+            message = self.bus.recv(0)
+        return messages
+
+    def drain(self):
+        """
+        Receives every message already queued without blocking.
+
+        Returns:
+            list[bytearray]: The raw message data.
+        """
+        return self.receive_data_batch(0)
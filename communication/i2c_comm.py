@@ -1,11 +1,23 @@
 # -*- coding: utf-8 -*-
 """I2C communication module."""
 
-import smbus
+import threading
+
+from smbus2 import I2cFunc, SMBus, i2c_msg
 
 
 class I2CCommunication:
-    """Handles I2C communication using smbus."""
+    """
+    Handles I2C communication using smbus2.
+    Bus access is serialized with a lock so the handle can be shared
+    between the receive worker and senders on other threads.
+    Plain I2C transfers (i2c_rdwr) are used when the adapter supports
+    them; SMBus-only controllers (e.g. i2c-i801, piix4) fall back to SMBus
+    byte and block commands.
+    """
+
+    # Largest payload accepted by an SMBus block write
+    SMBUS_BLOCK_MAX = 32
 
     def __init__(self, bus_number, device_address):
         """
@@ -19,16 +31,22 @@ class I2CCommunication:
         self.device_address = device_address
         self.bus = None
         self._connected = False
+        self._plain_i2c = False
+        self._lock = threading.Lock()
 
     def connect(self):
         """Initializes the SMBus."""
         if self.bus:
             return  # Already connected
         try:
-            self.bus = smbus.SMBus(self.bus_number)
+            self.bus = SMBus(self.bus_number)
             # A simple read to check if device is present
-            self.bus.read_byte(self.device_address)
+            with self._lock:
+                self.bus.read_byte(self.device_address)
+            self._plain_i2c = bool(self.bus.funcs & I2cFunc.I2C)
             self._connected = True
+            # The bus is open now, so sends can skip the connection check
+            self.send_data = self._write
         except (FileNotFoundError, IOError) as e:
             self._connected = False
             raise ConnectionError(
@@ -38,51 +56,98 @@ class I2CCommunication:
 
     def disconnect(self):
         """Closes the SMBus connection."""
-        if self.bus:
-            self.bus.close()
-            self.bus = None
-        self._connected = False
+        # Restore the checked send_data method
+        self.__dict__.pop('send_data', None)
+        with self._lock:
+            if self.bus:
+                self.bus.close()
+                self.bus = None
+            self._connected = False
 
     def is_connected(self):
         """Checks if the connection is active."""
         return self._connected
 
+    def fileno(self):
+        """I2C has no readable descriptor; the device must be polled."""
+        return None
+
     def send_data(self, data, register=None):
         """
-        Sends data over I2C. Can send a list of bytes or a string.
+        Sends data over I2C. Can send a list of bytes, bytes or a string.
 
         Args:
-            data (str or list[int]): Data to send. If string, it's converted
-                                     to a list of ASCII values.
+            data (str, bytes or list[int]): Data to send. If string, it's
+                                            encoded as UTF-8.
             register (int, optional): The register to write to. If None,
-                                      writes a block of data.
+                                      the payload is written as one raw I2C
+                                      transaction.
         """
         if not self.is_connected():
             raise ConnectionError("I2C not connected.")
+        self._write(data, register)
 
+    def _write(self, data, register=None):
+        """Converts data and writes it to the open bus."""
         if isinstance(data, str):
-            data_bytes = [ord(c) for c in data]
-        elif isinstance(data, list):
+            data_bytes = data.encode('utf-8')
+        elif isinstance(data, (bytes, bytearray, list)):
             data_bytes = data
         else:
-            raise TypeError("Data must be a string or a list of integers.")
+            raise TypeError(
+                "Data must be a string, bytes or a list of integers.")
 
         try:
-            if register is not None:
-                # Write a block of data to a specific register
-                self.bus.write_i2c_block_data(
-                    self.device_address, register, data_bytes
-                )
-            else:
-                # Simple write, sends the first byte of data
-                if data_bytes:
-                    self.bus.write_byte(self.device_address, data_bytes[0])
+            with self._lock:
+                if (register is not None
+                        and len(data_bytes) <= self.SMBUS_BLOCK_MAX):
+                    # Write a block of data to a specific register
+                    self.bus.write_i2c_block_data(
+                        self.device_address, register, list(data_bytes)
+                    )
+                    return
+                if register is not None:
+                    # Too long for an SMBus block write; send register and
+                    # data as one raw write instead
+                    data_bytes = bytes([register]) + bytes(data_bytes)
+                if not data_bytes:
+                    return
+                if self._plain_i2c:
+                    # Raw write of the whole payload in one transaction;
+                    # i2c_msg takes the bytes buffer as is
+                    msg = i2c_msg.write(self.device_address, data_bytes)
+                    self.bus.i2c_rdwr(msg)
+                else:
+                    self._smbus_write(data_bytes)
         except IOError as e:
             raise IOError(f"I2C write failed: {e}")
 
+    def _smbus_write(self, data_bytes):
+        """
+        Writes a raw payload with SMBus commands on adapters without plain
+        I2C support. The first byte goes out as the SMBus command byte,
+        which puts the same bytes on the wire as a raw write.
+        """
+        if len(data_bytes) == 1:
+            self.bus.write_byte(self.device_address, data_bytes[0])
+        elif len(data_bytes) - 1 <= self.SMBUS_BLOCK_MAX:
+            self.bus.write_i2c_block_data(
+                self.device_address, data_bytes[0], list(data_bytes[1:])
+            )
+        else:
+            raise IOError(
+                f"{len(data_bytes)} byte write exceeds the SMBus block "
+                f"limit and the adapter does not support plain I2C"
+            )
+
     def receive_data(self, num_bytes=1, register=None):
         """
-        Receives data from I2C.
+        Receives data from I2C in a single combined transaction.
+
+        When a register is given, the register write and the data read are
+        issued with a repeated START, so the whole read costs one bus
+        transaction instead of one per byte. SMBus-only adapters use an
+        SMBus block read, or byte reads without a register.
 
         Args:
             num_bytes (int): Number of bytes to read.
@@ -95,11 +160,24 @@ class I2CCommunication:
             raise ConnectionError("I2C not connected.")
         
         try:
-            if register is not None:
-                return self.bus.read_i2c_block_data(
-                    self.device_address, register, num_bytes
-                )
-            else:
-                return [self.bus.read_byte(self.device_address) for _ in range(num_bytes)]
+            with self._lock:
+                if not self._plain_i2c:
+                    return self._smbus_read(num_bytes, register)
+                read = i2c_msg.read(self.device_address, num_bytes)
+                if register is not None:
+                    write = i2c_msg.write(self.device_address, [register])
+                    self.bus.i2c_rdwr(write, read)
+                else:
+                    self.bus.i2c_rdwr(read)
+            return list(read)
         except IOError as e:
             raise IOError(f"I2C read failed: {e}")
+
+    def _smbus_read(self, num_bytes, register):
+        """Reads with SMBus commands on adapters without plain I2C."""
+        if register is not None:
+            return self.bus.read_i2c_block_data(
+                self.device_address, register, num_bytes
+            )
+        return [self.bus.read_byte(self.device_address)
+                for _ in range(num_bytes)]
@@ -1,8 +1,22 @@
 # -*- coding: utf-8 -*-
 """RS485 communication module."""
 
+import array
+
 import serial
 
+try:
+    import fcntl
+    import termios
+except ImportError:  # Not available on Windows
+    fcntl = None
+    termios = None
+
+# Index of the `flags` field in Linux's struct serial_struct (read as ints)
+_SERIAL_FLAGS_INDEX = 4
+# ASYNC_LOW_LATENCY from <linux/tty_flags.h>
+_ASYNC_LOW_LATENCY = 1 << 13
+
 
 class RS485Communication:
     """
@@ -12,7 +26,11 @@ class RS485Communication:
     RTS/DTR toggling is needed, this class would need expansion.
     """
 
-    def __init__(self, port, baudrate, timeout=1):
+    # Received bytes without a line break are discarded beyond this size
+    RX_BUF_MAX = 1 << 20
+
+    def __init__(self, port, baudrate, timeout=1, direction_control=False,
+                 low_latency=False):
         """
         Initializes the RS485 communication object.
 
@@ -20,11 +38,19 @@ class RS485Communication:
             port (str): The serial port name (e.g., '/dev/ttyUSB0').
             baudrate (int): The communication speed.
             timeout (int): Read timeout in seconds.
+            direction_control (bool): Set when the transceiver direction is
+                                      switched in software; each send then
+                                      waits until the data has left the UART.
+            low_latency (bool): Ask the Linux tty driver to deliver received
+                                bytes immediately (ASYNC_LOW_LATENCY).
         """
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
+        self.direction_control = direction_control
+        self.low_latency = low_latency
         self.serial_conn = None
+        self._rx_buf = bytearray()
 
     def connect(self):
         """Establishes the serial connection for RS485."""
@@ -38,34 +64,78 @@ class RS485Communication:
             )
         except serial.SerialException as e:
             raise ConnectionError(f"Failed to open RS485 port {self.port}: {e}")
+        if self.low_latency:
+            self._set_low_latency()
+        # The port is open now, so sends can skip the connection check
+        self.send_data = self._write
+
+    def _set_low_latency(self):
+        """
+        Sets ASYNC_LOW_LATENCY on the port (TIOCGSERIAL/TIOCSSERIAL).
+        This is best effort: many USB adapters do not support it, in which
+        case the port keeps its default behaviour.
+        """
+        if fcntl is None or not hasattr(termios, 'TIOCGSERIAL'):
+            return
+        buf = array.array('i', [0] * 32)
+        try:
+            fcntl.ioctl(self.serial_conn.fileno(), termios.TIOCGSERIAL, buf)
+            buf[_SERIAL_FLAGS_INDEX] |= _ASYNC_LOW_LATENCY
+            fcntl.ioctl(self.serial_conn.fileno(), termios.TIOCSSERIAL, buf)
+        except OSError:
+            pass
 
     def disconnect(self):
         """Closes the serial connection."""
+        # Restore the checked send_data method
+        self.__dict__.pop('send_data', None)
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
             self.serial_conn = None
+        self._rx_buf.clear()
 
     def is_connected(self):
         """Checks if the serial port is open."""
         return self.serial_conn and self.serial_conn.is_open
 
+    def fileno(self):
+        """
+        Returns the serial port file descriptor for readiness polling.
+
+        Returns:
+            int: The descriptor, or None if not connected or unsupported.
+        """
+        if not self.is_connected():
+            return None
+        # pyserial only exposes fileno() on POSIX platforms
+        fileno = getattr(self.serial_conn, 'fileno', None)
+        return fileno() if fileno else None
+
     def send_data(self, data):
         """
         Sends data over RS485.
 
         Args:
-            data (str): The string data to send.
+            data (str or bytes): The data to send. Strings are encoded as
+                                 UTF-8; bytes are written unchanged.
 
         Raises:
             ConnectionError: If not connected.
         """
         if not self.is_connected():
             raise ConnectionError("RS485 not connected.")
+        self._write(data)
+
+    def _write(self, data):
+        """Encodes and writes data to the open port."""
+        if not isinstance(data, (bytes, bytearray)):
+            data = data.encode('utf-8')
         try:
             # Before sending, one might toggle a GPIO pin for the transceiver's DE pin
-            self.serial_conn.write(data.encode('utf-8'))
-            # After sending, wait for transmission to complete then toggle DE pin off
-            self.serial_conn.flush()
+            self.serial_conn.write(data)
+            if self.direction_control:
+                # Wait for transmission to complete, then toggle DE pin off
+                self.serial_conn.flush()
         except serial.SerialTimeoutException as e:
             raise TimeoutError(f"RS485 send timeout: {e}")
 
@@ -74,14 +144,54 @@ class RS485Communication:
         Receives data from RS485.
 
         Returns:
-            str: The received data, decoded as UTF-8.
+            str: Every complete line received so far, decoded as UTF-8 and
+                 newline-separated, or None if no line is complete yet.
 
         Raises:
             ConnectionError: If not connected.
         """
         if not self.is_connected():
             raise ConnectionError("RS485 not connected.")
-        
+
         # Before receiving, one might ensure the transceiver's RE pin is enabled
-        received_data = self.serial_conn.readline()
-        return received_data.decode('utf-8', errors='ignore').strip()
+        waiting = self.serial_conn.in_waiting
+        # With nothing waiting, read(1) blocks for up to `timeout`
+        self._rx_buf += self.serial_conn.read(waiting or 1)
+        return '\n'.join(self._split_lines()) or None
+
+    def drain(self):
+        """
+        Reads everything already received. Call only once the port has
+        been reported readable, as read() then returns without waiting.
+
+        Returns:
+            list[str]: Every complete line received so far, decoded as UTF-8.
+
+        Raises:
+            ConnectionError: If not connected.
+        """
+        if not self.is_connected():
+            raise ConnectionError("RS485 not connected.")
+        # Readiness with nothing waiting means hang-up/EOF (e.g. the other
+        # end of a pty closed); reading then raises SerialException
+        # instead of leaving the worker spinning on a readable port
+        waiting = self.serial_conn.in_waiting
+        self._rx_buf += self.serial_conn.read(waiting or 1)
+        return self._split_lines()
+
+    def _split_lines(self):
+        """
+        Removes every complete line from the RX buffer.
+
+        Returns:
+            list[str]: The complete, non-empty lines decoded as UTF-8.
+        """
+        end = self._rx_buf.rfind(b'\n')
+        if end < 0:
+            if len(self._rx_buf) > self.RX_BUF_MAX:
+                self._rx_buf.clear()  # Overrun without line breaks
+            return []
+        text = self._rx_buf[:end].decode('utf-8', errors='ignore')
+        del self._rx_buf[:end + 1]
+        lines = [line.strip() for line in text.split('\n')]
+        return [line for line in lines if line]
@@ -7,6 +7,9 @@ import serial
 class UARTCommunication:
     """Handles UART communication using pyserial."""
 
+    # Received bytes without a line break are discarded beyond this size
+    RX_BUF_MAX = 1 << 20
+
     def __init__(self, port, baudrate, timeout=1):
         """
         Initializes the UART communication object.
@@ -20,6 +23,7 @@ class UARTCommunication:
         self.baudrate = baudrate
         self.timeout = timeout
         self.serial_conn = None
+        self._rx_buf = bytearray()
 
     def connect(self):
         """Establishes the serial connection."""
@@ -31,53 +35,123 @@ class UARTCommunication:
             )
         except serial.SerialException as e:
             raise ConnectionError(f"Failed to open port {self.port}: {e}")
+        # The port is open now, so sends can skip the connection check
+        self.send_data = self._write
 
     def disconnect(self):
         """Closes the serial connection."""
+        # Restore the checked send_data method
+        self.__dict__.pop('send_data', None)
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
             self.serial_conn = None
+        self._rx_buf.clear()
 
     def is_connected(self):
         """Checks if the serial port is open."""
         return self.serial_conn and self.serial_conn.is_open
 
+    def fileno(self):
+        """
+        Returns the serial port file descriptor for readiness polling.
+
+        Returns:
+            int: The descriptor, or None if not connected or unsupported.
+        """
+        if not self.is_connected():
+            return None
+        # pyserial only exposes fileno() on POSIX platforms
+        fileno = getattr(self.serial_conn, 'fileno', None)
+        return fileno() if fileno else None
+
     def send_data(self, data):
         """
         Sends data over UART.
 
         Args:
-            data (str): The string data to send.
+            data (str or bytes): The data to send. Strings are encoded as
+                                 UTF-8; bytes are written unchanged.
 
         Raises:
             ConnectionError: If not connected.
         """
         if not self.is_connected():
             raise ConnectionError("UART not connected.")
+        self._write(data)
+
+    def _write(self, data):
+        """Encodes and writes data to the open port."""
+        if not isinstance(data, (bytes, bytearray)):
+            data = data.encode('utf-8')
         try:
-            self.serial_conn.write(data.encode('utf-8'))
+            self.serial_conn.write(data)
         except serial.SerialTimeoutException as e:
             raise TimeoutError(f"UART send timeout: {e}")
 
     def receive_data(self, num_bytes=None):
         """
-        Receives data from UART. Reads one line by default.
+        Receives data from UART. Reads complete lines by default.
 
         Args:
             num_bytes (int, optional): Number of bytes to read.
-                                       If None, reads until a newline.
+                                       If None, returns every complete line
+                                       received so far.
 
         Returns:
-            str: The received data, decoded as UTF-8.
+            str: The received data, decoded as UTF-8, or None if no
+                 complete line is available yet.
 
         Raises:
             ConnectionError: If not connected.
         """
         if not self.is_connected():
             raise ConnectionError("UART not connected.")
-        if num_bytes:
-            received_data = self.serial_conn.read(num_bytes)
-        else:
-            received_data = self.serial_conn.readline()
-        
+        if not num_bytes:
+            waiting = self.serial_conn.in_waiting
+            # With nothing waiting, read(1) blocks for up to `timeout`
+            self._rx_buf += self.serial_conn.read(waiting or 1)
+            return '\n'.join(self._split_lines()) or None
+        # Serve buffered bytes first so line and byte reads can be mixed
+        missing = num_bytes - len(self._rx_buf)
+        if missing > 0:
+            self._rx_buf += self.serial_conn.read(missing)
+        received_data = bytes(self._rx_buf[:num_bytes])
+        del self._rx_buf[:num_bytes]
         return received_data.decode('utf-8', errors='ignore').strip()
+
+    def drain(self):
+        """
+        Reads everything already received. Call only once the port has
+        been reported readable, as read() then returns without waiting.
+
+        Returns:
+            list[str]: Every complete line received so far, decoded as UTF-8.
+
+        Raises:
+            ConnectionError: If not connected.
+        """
+        if not self.is_connected():
+            raise ConnectionError("UART not connected.")
+        # Readiness with nothing waiting means hang-up/EOF (e.g. the other
+        # end of a pty closed); reading then raises SerialException
+        # instead of leaving the worker spinning on a readable port
+        waiting = self.serial_conn.in_waiting
+        self._rx_buf += self.serial_conn.read(waiting or 1)
+        return self._split_lines()
+
+    def _split_lines(self):
+        """
+        Removes every complete line from the RX buffer.
+
+        Returns:
+            list[str]: The complete, non-empty lines decoded as UTF-8.
+        """
+        end = self._rx_buf.rfind(b'\n')
+        if end < 0:
+            if len(self._rx_buf) > self.RX_BUF_MAX:
+                self._rx_buf.clear()  # Overrun without line breaks
+            return []
+        text = self._rx_buf[:end].decode('utf-8', errors='ignore')
+        del self._rx_buf[:end + 1]
+        lines = [line.strip() for line in text.split('\n')]
+        return [line for line in lines if line]
@@ -4,13 +4,18 @@ Host Computer Assistant Main Application
 Author: BaleDeng
 Date: 2025-09-20
 """
+import selectors
+import socket
 import sys
+import threading
+import time
+from functools import lru_cache
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QLineEdit,
-                             QComboBox, QGroupBox, QTextEdit, QTabWidget,
+                             QComboBox, QGroupBox, QPlainTextEdit, QTabWidget,
                              QGridLayout, QMessageBox)
-from PyQt5.QtCore import QThread, pyqtSignal, QObject
-from PyQt5.QtGui import QIcon, QFont
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, QObject, QRegExp
+from PyQt5.QtGui import QIcon, QFont, QRegExpValidator
 
 # Import communication modules
 from communication.uart_comm import UARTCommunication
@@ -44,13 +49,13 @@ QGroupBox::title {
 QLabel {
     color: #E0E0E0;
 }
-QLineEdit, QTextEdit, QComboBox {
+QLineEdit, QPlainTextEdit, QComboBox {
     background-color: #2D2D2D;
     border: 1px solid #4A4A4A;
     border-radius: 5px;
     padding: 5px;
 }
-QLineEdit:focus, QTextEdit:focus, QComboBox:focus {
+QLineEdit:focus, QPlainTextEdit:focus, QComboBox:focus {
     border: 1px solid #FF69B4;
 }
 QPushButton {
@@ -92,34 +97,138 @@ QTabBar::tab:selected {
 """
 
 
+@lru_cache(maxsize=64)
+def _encode_pid(kp, ki, kd):
+    """Builds and encodes a PID command, cached for repeated values."""
+    # Example command format: "PID,kp,ki,kd\n"
+    # This should be adapted to the lower machine's protocol.
+    return f"PID,{kp},{ki},{kd}\n".encode('utf-8')
+
+
+@lru_cache(maxsize=64)
+def _encode_command(data):
+    """Terminates and encodes a custom command, cached for repeated values."""
+    return f"{data}\n".encode('utf-8')
+
+
+def _decode_rx(data):
+    """Decodes received bytes for display; str is passed through."""
+    if isinstance(data, str):
+        return data
+    # Commands are plain ASCII, which decodes without a UTF-8 state machine
+    if data.isascii():
+        return data.decode('ascii')
+    return data.decode('utf-8', errors='ignore')
+
+
+def _make_selector():
+    """
+    Returns a level-triggered selector: epoll on Linux, select() otherwise.
+    Descriptors are registered once per connection, and level triggering
+    keeps reporting a device until drain() has emptied it. poll() is
+    avoided because macOS does not support it on ttys (POLLNVAL).
+    """
+    if hasattr(selectors, 'EpollSelector'):
+        return selectors.EpollSelector()
+    return selectors.SelectSelector()
+
+
 class CommunicationWorker(QObject):
     """
     Worker thread for handling continuous data reception to prevent UI freezing.
     """
     data_received = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
-    _is_running = True
 
-    def __init__(self, comm_instance):
+    # Received data is forwarded to the GUI in batches, at most once per
+    # EMIT_INTERVAL seconds or as soon as EMIT_MAX_ITEMS items are pending.
+    EMIT_INTERVAL = 0.02
+    EMIT_MAX_ITEMS = 32
+
+    def __init__(self, comm_instance, poll_interval_ms=50):
+        """
+        Args:
+            comm_instance: A connected communication object. Objects whose
+                           fileno() returns a descriptor must also provide
+                           a drain() that reads without blocking once the
+                           descriptor is readable and returns a list of str
+                           or bytes.
+            poll_interval_ms (int): Polling period for devices that cannot
+                                    be waited on through a file descriptor
+                                    (e.g. I2C).
+        """
         super().__init__()
         self.comm = comm_instance
+        self.poll_interval_ms = poll_interval_ms
+        self._selector = None
+        self._stop_event = threading.Event()
+        # stop() writes to this socket pair to interrupt a pending select()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self._buf = []
+        self._last_emit = 0.0
 
     def run(self):
         """Continuously listens for incoming data."""
-        self._is_running = True
-        while self._is_running:
-            try:
-                data = self.comm.receive_data()
-                if data:
-                    self.data_received.emit(str(data))
-                QThread.msleep(50)  # Prevent high CPU usage
-            except Exception as e:
-                self.error_occurred.emit(f"Data reception error: {e}")
-                break
+        fd = self.comm.fileno()
+        if fd is not None:
+            # Sleep in the kernel until the device is readable, then drain
+            # everything it has without blocking. io_uring does not help
+            # here: tty reads cannot complete inline and are punted to
+            # kernel worker threads, and reading the CAN socket directly
+            # would bypass python-can's frame decoding.
+            self._selector = _make_selector()
+            self._selector.register(fd, selectors.EVENT_READ)
+            self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    if self._selector:
+                        # Wake up in time to flush pending data
+                        timeout = self.EMIT_INTERVAL if self._buf else 1.0
+                        for key, _ in self._selector.select(timeout=timeout):
+                            if key.fileobj is not self._wakeup_r:
+                                self._buf.extend(self.comm.drain())
+                    else:
+                        # Devices without a descriptor (I2C) are polled
+                        data = self.comm.receive_data()
+                        if data:
+                            self._buf.append(str(data))
+                        # Event.wait returns early when stop() is called
+                        self._stop_event.wait(self.poll_interval_ms / 1000)
+                    self._flush()
+                except Exception as e:
+                    self._flush(force=True)
+                    self.error_occurred.emit(f"Data reception error: {e}")
+                    break
+            self._flush(force=True)
+        finally:
+            if self._selector:
+                self._selector.close()
+                self._selector = None
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+
+    def _flush(self, force=False):
+        """Emits pending data as one signal once the batch is due."""
+        if not self._buf:
+            return
+        now = time.monotonic()
+        if (force or len(self._buf) >= self.EMIT_MAX_ITEMS
+                or now - self._last_emit >= self.EMIT_INTERVAL):
+            # Raw bytes are only decoded here, once per emitted batch
+            self.data_received.emit("\n".join(map(_decode_rx, self._buf)))
+            self._buf.clear()
+            self._last_emit = now
 
     def stop(self):
-        """Stops the listening loop."""
-        self._is_running = False
+        """Stops the listening loop without waiting for a timeout."""
+        self._stop_event.set()
+        try:
+            self._wakeup_w.send(b'\0')
+        except OSError:
+            pass  # Loop already finished and closed the socket
 
 
 class ParameterAdjustmentWindow(QWidget):
@@ -135,7 +244,6 @@ class ParameterAdjustmentWindow(QWidget):
         self.setWindowIcon(QIcon.fromTheme("preferences-system"))
         self.setGeometry(200, 200, 400, 300)
         self.initUI()
-        self.setStyleSheet(STYLE_SHEET)
 
     def initUI(self):
         layout = QGridLayout(self)
@@ -174,6 +282,17 @@ class ParameterAdjustmentWindow(QWidget):
 
 class MainWindow(QMainWindow):
     """Main application window."""
+    # Emitted from the CAN TX thread when a queued frame fails
+    tx_error = pyqtSignal(str)
+
+    # Commands issued within this many ms are merged before sending. Serial
+    # writes are already buffered by the kernel, so they only coalesce
+    # commands issued in the same event loop iteration.
+    TX_HOLDUP_MS = {"UART": 0, "RS485": 0, "CAN": 10, "I2C": 10}
+    # Largest merged payload per transfer. Serial links are byte streams
+    # and take any size; on CAN and I2C each transfer is one frame or
+    # transaction that the receiver must fit in its buffer.
+    TX_MAX_PAYLOAD = {"UART": None, "RS485": None, "CAN": 8, "I2C": 32}
 
     def __init__(self):
         super().__init__()
@@ -185,10 +304,14 @@ class MainWindow(QMainWindow):
         self.worker_thread = None
         self.comm_worker = None
         self.param_window = None
+        self._tx_pending = []
+        self._tx_holdup_ms = 0
+        self._tx_max_payload = None
 
         self.initUI()
-        self.setStyleSheet(STYLE_SHEET)
         self.update_connection_inputs()
+        self.cache_bus_no()
+        self.cache_addr()
 
     def initUI(self):
         """Initializes the User Interface components."""
@@ -221,6 +344,16 @@ class MainWindow(QMainWindow):
         self.addr_label = QLabel("地址 (Address):")
         self.addr_input = QLineEdit("0x42")
 
+        # Reject malformed numbers while typing; parsed values are cached
+        # when editing finishes so connecting needs no parsing. Plain digits
+        # only: QIntValidator accepts locale group separators ("115,200")
+        # that int() cannot parse.
+        self.baud_input.setValidator(
+            QRegExpValidator(QRegExp(r'[1-9][0-9]{0,7}')))
+        self.bus_input.setValidator(QRegExpValidator(QRegExp(r'[0-9]{1,3}')))
+        self.addr_input.setValidator(
+            QRegExpValidator(QRegExp(r'0[xX][0-9A-Fa-f]+')))
+
         conn_layout.addWidget(self.port_label, 1, 0)
         conn_layout.addWidget(self.port_input, 1, 1)
         conn_layout.addWidget(self.baud_label, 2, 0)
@@ -239,8 +372,10 @@ class MainWindow(QMainWindow):
         # 日志组
         log_group = QGroupBox("日志 (Log)")
         log_layout = QVBoxLayout(log_group)
-        self.log_display = QTextEdit()
+        self.log_display = QPlainTextEdit()
         self.log_display.setReadOnly(True)
+        # Drop the oldest lines instead of growing without bound
+        self.log_display.setMaximumBlockCount(5000)
         log_layout.addWidget(self.log_display)
         left_layout.addWidget(log_group)
 
@@ -290,8 +425,12 @@ class MainWindow(QMainWindow):
         self.connect_button.clicked.connect(self.toggle_connection)
         self.protocol_combo.currentTextChanged.connect(
             self.update_connection_inputs)
+        self.baud_input.editingFinished.connect(self.cache_baud)
+        self.bus_input.editingFinished.connect(self.cache_bus_no)
+        self.addr_input.editingFinished.connect(self.cache_addr)
         self.send_pid_button.clicked.connect(self.send_pid_data)
         self.open_param_window_button.clicked.connect(self.open_param_window)
+        self.tx_error.connect(self.log)
 
     def update_connection_inputs(self):
         """Shows/hides input fields based on selected protocol."""
@@ -316,12 +455,41 @@ class MainWindow(QMainWindow):
         else:
             self.baud_label.setText("波特率 (Baudrate):")
             self.baud_input.setText("115200")
+        # setText() does not emit editingFinished
+        self.cache_baud()
 
         self.bus_label.setVisible(is_i2c)
         self.bus_input.setVisible(is_i2c)
         self.addr_label.setVisible(is_i2c)
         self.addr_input.setVisible(is_i2c)
 
+    def cache_baud(self):
+        """Caches the parsed baudrate/bitrate input."""
+        try:
+            self._baud = int(self.baud_input.text())
+        except ValueError:
+            # Leave the field marked modified so connecting reports it
+            return
+        self.baud_input.setModified(False)
+
+    def cache_bus_no(self):
+        """Caches the parsed I2C bus number input."""
+        try:
+            self._bus_no = int(self.bus_input.text())
+        except ValueError:
+            # Leave the field marked modified so connecting reports it
+            return
+        self.bus_input.setModified(False)
+
+    def cache_addr(self):
+        """Caches the parsed hexadecimal I2C address input."""
+        try:
+            self._addr = int(self.addr_input.text(), 16)
+        except ValueError:
+            # Leave the field marked modified so connecting reports it
+            return
+        self.addr_input.setModified(False)
+
     def toggle_connection(self):
         """Connects or disconnects from the device."""
         if self.comm_instance and self.comm_instance.is_connected():
@@ -334,22 +502,31 @@ class MainWindow(QMainWindow):
         protocol = self.protocol_combo.currentText()
         try:
             if protocol in ["UART", "RS485"]:
+                self._commit_input(self.baud_input, self.cache_baud,
+                                   "baudrate")
                 port = self.port_input.text()
-                baud = int(self.baud_input.text())
+                baud = self._baud
                 self.comm_instance = UARTCommunication(
                     port, baud) if protocol == "UART" else RS485Communication(
                         port, baud)
             elif protocol == "CAN":
+                self._commit_input(self.baud_input, self.cache_baud, "bitrate")
                 channel = self.channel_input.text()
-                bitrate = int(self.baud_input.text())
-                self.comm_instance = CANCommunication(channel=channel,
-                                                      bitrate=bitrate)
+                bitrate = self._baud
+                self.comm_instance = CANCommunication(
+                    channel=channel, bitrate=bitrate,
+                    on_tx_error=self._report_tx_error)
             elif protocol == "I2C":
-                bus = int(self.bus_input.text())
-                addr = int(self.addr_input.text(), 16)
+                self._commit_input(self.bus_input, self.cache_bus_no,
+                                   "bus number")
+                self._commit_input(self.addr_input, self.cache_addr, "address")
+                bus = self._bus_no
+                addr = self._addr
                 self.comm_instance = I2CCommunication(bus, addr)
 
             self.comm_instance.connect()
+            self._tx_holdup_ms = self.TX_HOLDUP_MS[protocol]
+            self._tx_max_payload = self.TX_MAX_PAYLOAD[protocol]
             self.log(f"[{protocol}] Connected successfully.")
 
             # Start worker thread for receiving data
@@ -375,8 +552,24 @@ class MainWindow(QMainWindow):
                                  f"Failed to connect: {e}")
             self.comm_instance = None
 
+    @staticmethod
+    def _commit_input(line_edit, cache, name):
+        """
+        Makes sure the cached value matches the field before connecting.
+        Text typed but never committed (editingFinished does not fire when
+        the Connect click leaves focus in the field, e.g. on macOS) is
+        parsed here once.
+        """
+        if not line_edit.hasAcceptableInput():
+            raise ValueError(f"Invalid {name}: '{line_edit.text()}'")
+        if line_edit.isModified():
+            cache()
+            if line_edit.isModified():
+                raise ValueError(f"Invalid {name}: '{line_edit.text()}'")
+
     def disconnect_device(self):
         """Closes the connection."""
+        self._flush_tx()
         if self.comm_worker:
             self.comm_worker.stop()
         if self.worker_thread:
@@ -405,15 +598,7 @@ class MainWindow(QMainWindow):
         ki = self.ki_input.text()
         kd = self.kd_input.text()
 
-        # Example command format: "PID,kp,ki,kd\n"
-        # This should be adapted to the lower machine's protocol.
-        command = f"PID,{kp},{ki},{kd}\n"
-
-        try:
-            self.comm_instance.send_data(command)
-            self.log(f"Sent: {command.strip()}")
-        except Exception as e:
-            self.log(f"Error sending PID data: {e}")
+        self._queue_tx(_encode_pid(kp, ki, kd), f"PID,{kp},{ki},{kd}")
 
     def send_custom_data(self, data):
         """Sends custom data from other windows."""
@@ -421,12 +606,60 @@ class MainWindow(QMainWindow):
             self.log("Not connected. Cannot send data.")
             return
 
-        command = f"{data}\n"
+        self._queue_tx(_encode_command(data), data.strip())
+
+    def _queue_tx(self, payload, text):
+        """
+        Queues an encoded command. The first command starts the hold-up
+        timer; commands queued until it fires are merged into as few
+        transfers as the link allows.
+        """
+        if not self._tx_pending:
+            QTimer.singleShot(self._tx_holdup_ms, self._flush_tx)
+        self._tx_pending.append((payload, text))
+
+    def _flush_tx(self):
+        """Sends all queued commands, merged up to the link's size limit."""
+        pending, self._tx_pending = self._tx_pending, []
+        if not pending:
+            return
+        if not self.comm_instance or not self.comm_instance.is_connected():
+            self.log("Not connected. Cannot send data.")
+            return
+
         try:
-            self.comm_instance.send_data(command)
-            self.log(f"Sent: {command.strip()}")
+            for batch in self._split_tx(pending):
+                self.comm_instance.send_data(b"".join(p for p, _ in batch))
+                for _, text in batch:
+                    self.log(f"Sent: {text}")
         except Exception as e:
-            self.log(f"Error sending custom data: {e}")
+            self.log(f"Error sending data: {e}")
+
+    def _report_tx_error(self, payload, error):
+        """Reports a frame that failed after being queued (any thread)."""
+        self.tx_error.emit(
+            f"Error sending data: {_decode_rx(bytes(payload))!r}: {error}")
+
+    def _split_tx(self, pending):
+        """
+        Groups queued commands into transfers of at most _tx_max_payload
+        bytes. A command longer than the limit is sent on its own, as it
+        would be without merging.
+        """
+        limit = self._tx_max_payload
+        if limit is None:
+            # Byte stream: newline-terminated commands can simply be joined
+            return [pending]
+        batches = []
+        batch, size = [], 0
+        for item in pending:
+            if batch and size + len(item[0]) > limit:
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(item)
+            size += len(item[0])
+        batches.append(batch)
+        return batches
 
     def open_param_window(self):
         """Opens the advanced parameter adjustment window."""
@@ -437,7 +670,7 @@ class MainWindow(QMainWindow):
 
     def log(self, message):
         """Appends a message to the log display."""
-        self.log_display.append(message)
+        self.log_display.appendPlainText(message)
 
     def handle_comm_error(self, error_message):
         """Handles communication errors from the worker."""
@@ -455,6 +688,8 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    # Applied once for every window instead of re-parsed per widget tree
+    app.setStyleSheet(STYLE_SHEET)
     window = MainWindow()
     window.show()
     sys.exit(app.exec_())